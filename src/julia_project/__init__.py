@@ -1,15 +1,11 @@
 __version__ = "0.1.27"
 
 import os
-import sys
-import ctypes
-import shutil
 from ._julia_project import JuliaProject
 
+# This must be set before juliacall is imported. Other environment variables read by
+# Julia are set when the project is initialized. See _julia_project._julia_env.
 os.environ["PYTHON_JULIACALL_NOINIT"] = "yes"
-os.environ["JULIA_PYTHONCALL_EXE"] = sys.executable or ''
-os.environ['JULIA_PYTHONCALL_LIBPTR'] = str(ctypes.pythonapi._handle) or ''
-os.environ['PYTHON'] = shutil.which("python") or ''
 
 # This is only for debugging
 # import julia
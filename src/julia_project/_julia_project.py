@@ -1,13 +1,13 @@
 import logging
 import os
+import sys
+import ctypes
+import functools
+import importlib
 import shutil
 import warnings
-import distutils.dir_util
-import find_julia
-import julia.find_libpython
 from .julia_system_image import JuliaSystemImage
 from . import utils
-import julia_project_basic as basic
 
 from .environment import EnvVars
 from .questions import ProjectQuestions
@@ -16,6 +16,8 @@ from .questions import ProjectQuestions
 # The depot referred to here is the default depot, i.e. ~/.julia
 # This true even if the user requests a "private" depo.
 # In the latter case, we will have a depot within the default depot.
+# The result depends only on the environment, so it is computed once.
+@functools.lru_cache(maxsize=1)
 def _get_parent_project_path():
     env_path = utils.get_virtual_env_path()
     if env_path is None:
@@ -23,22 +25,37 @@ def _get_parent_project_path():
     return os.path.join(env_path, "julia_project")
 
 
+
+# These are read by PythonCall.jl and PyCall.jl when Julia starts. Computing them
+# requires searching PATH, so we wait until initialization and do it only once.
+@functools.lru_cache(maxsize=1)
+def _julia_env():
+    return {
+        "JULIA_PYTHONCALL_EXE": sys.executable or '',
+        "JULIA_PYTHONCALL_LIBPTR": str(ctypes.pythonapi._handle) or '',
+        "PYTHON": shutil.which("python") or '',
+    }
+
+
+# Map the name of each Python/Julia interface library to the module and class
+# implementing `CallJulia` for it. The modules are imported only when needed.
+_BACKENDS = {
+    "pyjulia": (".pyjulia", "PyJulia"),
+    "juliacall": (".juliacall", "JuliaCall"),
+}
+
+
 def _calljulia_lib(calljulia : str, logger=None):
-    if calljulia == "pyjulia":
-        if logger:
-            logger.info("importing PyJulia")
-        from .pyjulia import PyJulia
-        return PyJulia
-    if calljulia == "juliacall":
-        if logger:
-            logger.info("importing JuliaCall")
-        from .juliacall import JuliaCall
-        return JuliaCall
-    raise ValueError(f"calljulia must be 'pyjulia' or 'juliacall'. Got {calljulia}")
+    if calljulia not in _BACKENDS:
+        raise ValueError(f"calljulia must be 'pyjulia' or 'juliacall'. Got {calljulia}")
+    module_name, class_name = _BACKENDS[calljulia]
+    if logger:
+        logger.info(f"importing {class_name}")
+    return getattr(importlib.import_module(module_name, __package__), class_name)
 
 
 def _validate_calljulia(calljulia : str):
-    if calljulia not in ["pyjulia", "juliacall", None]:
+    if calljulia is not None and calljulia not in _BACKENDS:
         raise ValueError(f'calljulia must be one of "pyjulia", "juliacall", `None`. Got {calljulia}')
 
 
@@ -85,6 +102,8 @@ class JuliaProject:
         If `True` then log to the console as well as to a file.
     """
 
+    _utils_loaded = False
+
     def __init__(self,
                  name,
                  package_path,
@@ -112,10 +131,11 @@ class JuliaProject:
         self._logging_level = logging_level
         self._console_logging = console_logging
         self.questions = ProjectQuestions(depot=depot, env_vars=self._env_vars)
-        self._init_flags = {"initialized": False, "initializing": False, "disabled": False}
+        self._initialized = False
+        self._initializing = False
+        self._disabled = False
         self._post_init_hook = post_init_hook
         self._pre_instantiate_cmds = pre_instantiate_cmds
-        os.environ['PYCALL_JL_RUNTIME_PYTHON'] = shutil.which("python") or ''
         self.version_spec = version_spec
         self.strict_version = strict_version
         if calljulia is None:
@@ -132,6 +152,14 @@ class JuliaProject:
         self.julia_version = None
         self.project_path = None
         self.depot_path = None
+        # Paths to files in the package and project directories, computed once.
+        self._package_project_tomls = [self._in_package_dir(f) for f in utils.PROJECT_TOMLS]
+        self._package_log = self._in_package_dir(self.name + '.log')
+        self._project_tomls = None
+        self._project_manifests = None
+        self._loaded_sys_image = None
+        # Environment variables set by init, applied just before Julia is started.
+        self._pending_env = {}
 
 
     def _in_package_dir(self, rel_path):
@@ -147,11 +175,23 @@ class JuliaProject:
         self.project_path = os.path.join(_get_parent_project_path(), self.name + "-" + self.julia_version)
         os.makedirs(self.project_path, exist_ok = True)
         assert self.project_path is not None
-        os.environ["JULIA_PROJECT"] = self.project_path
-        self.logger.info(f'os.environ["JULIA_PROJECT"] = {self.project_path}')
-        utils.update_copy(self._in_package_dir("Project.toml"), self._in_project_dir("Project.toml"))
-        utils.update_copy(self._in_package_dir("JuliaProject.toml"), self._in_project_dir("JuliaProject.toml"))
-        if not utils.has_project_toml(self.project_path):
+        self._pending_env["JULIA_PROJECT"] = self.project_path
+        self.logger.info('os.environ["JULIA_PROJECT"] = %s', self.project_path)
+        self._project_tomls = [self._in_project_dir(f) for f in utils.PROJECT_TOMLS]
+        self._project_manifests = [self._in_project_dir(f) for f in utils.MANIFEST_TOMLS]
+        # Read the project directory once, rather than stat each file separately.
+        with os.scandir(self.project_path) as it:
+            entries = {entry.name: entry for entry in it}
+        has_project_toml = any(name in entries for name in utils.PROJECT_TOMLS)
+        for name, src, dest in zip(utils.PROJECT_TOMLS, self._package_project_tomls, self._project_tomls):
+            try:
+                src_stat = os.stat(src)
+            except FileNotFoundError:
+                continue
+            if name not in entries or entries[name].stat().st_mtime < src_stat.st_mtime:
+                utils.copy_with_times(src, dest, src_stat)
+                has_project_toml = True
+        if not has_project_toml:
             msg = utils.no_project_toml_message(self.project_path)
             self.logger.error(msg)
             raise FileNotFoundError(msg)
@@ -166,8 +206,8 @@ class JuliaProject:
             raise RuntimeError(
                 "This JuliaProject is already initialized. Disabling initialization makes no sense."
             )
-        old_val = self._init_flags['disabled']
-        self._init_flags['disabled'] = True
+        old_val = self._disabled
+        self._disabled = True
         return old_val
 
 
@@ -180,15 +220,15 @@ class JuliaProject:
             raise RuntimeError(
                 "This JuliaProject is already initialized. Enabling initialization makes no sense."
             )
-        old_val = self._init_flags['disabled']
-        self._init_flags['disabled'] = False
+        old_val = self._disabled
+        self._disabled = False
         return old_val
 
 
     @property
     def is_initialized(self):
         """This property has value `True` if `ensure_init` has been called and no errors were detected."""
-        return self._init_flags['initialized']
+        return self._initialized
 
 
     def ensure_init(self,
@@ -239,8 +279,8 @@ class JuliaProject:
             strict_version : bool If `True` then pre-release versions will be excluded when searching for
                 the Julia exectuable.
         """
-        if not self._init_flags['initialized'] and not self._init_flags['disabled'] and not self._init_flags['initializing']:
-            # if self._init_flags['initializing']:
+        if not self._initialized and not self._disabled and not self._initializing:
+            # if self._initializing:
             #     print("Initialization was aborted or failed. Trying again.")
             if use_sys_image is not None:
                 self._use_sys_image = use_sys_image
@@ -248,7 +288,7 @@ class JuliaProject:
             if calljulia is not None:
                 self._calljulia_name = calljulia
             if (self._calljulia_name == "pyjulia" and
-                julia.find_libpython.linked_libpython() is None):
+                utils.linked_libpython() is None):
                 warnings.warn(
 """
 Your python executable is statically linked to libpython and you (or a package
@@ -274,15 +314,15 @@ compatible with package that created this instance of JuliaProject.
             self._pre_instantiate_cmds = pre_instantiate_cmds
 
             try:
-                self._init_flags['initializing'] = True
+                self._initializing = True
                 self.init()
             except:
                 print("Initialization failed. You may try running again")
                 raise
             finally:
-                self._init_flags['initializing'] = False
+                self._initializing = False
         # Reiniting is a no-op
-        elif self._init_flags['initialized'] and calljulia is not None:
+        elif self._initialized and calljulia is not None:
             incompat_reinit = ((self.julia.__name__ == 'julia' and calljulia != 'pyjulia')
                                or
                                (self.julia.__name__ == 'juliacall' and calljulia != 'juliacall')
@@ -293,37 +333,43 @@ compatible with package that created this instance of JuliaProject.
 
     def init(self):
         """Run all steps to initialize and load Julia and the Julia project."""
+        import julia_project_basic as basic # pylint: disable=import-outside-toplevel
         self._setup_logging()
         self.logger.info("")
         self.logger.info("JuliaProject.init()")
+        os.environ.update(_julia_env())
+        self._pending_env.clear() # In case a previous attempt failed
         self.questions.logger = self.logger
         self.questions.read_environment_variables()
+        # The answers may change below, for instance in the callbacks passed to
+        # julia_project_basic. So we bind the dict, not the individual answers.
+        results = self.questions.results
         if self.julia_path is None:
             self._find_julia()
         if self.julia_path is None:
             raise FileNotFoundError("No julia executable found")
-        self.logger.info(f"julia path: {self.julia_path}")
-        self.julia_version = utils.julia_version_str(self.julia_path)
+        self.logger.info("julia path: %s", self.julia_path)
+        self.julia_version = utils.julia_version_str_persistent(
+            self.julia_path, os.path.join(_get_parent_project_path(), "julia_versions.json"))
         self.logger.info("Julia version: %s.", self.julia_version)
         self._set_project_path()
         self.sys_image_dir = self._in_project_dir(self.rel_sys_image_dir)
         package_sys_image_dir = os.path.join(self.package_path, self.rel_sys_image_dir)
         if os.path.exists(package_sys_image_dir):
-            self.logger.info(f"Copying/updating installed system image directory {self.sys_image_dir}")
-            distutils.dir_util.copy_tree(
-                package_sys_image_dir, self.sys_image_dir, update=1)
+            self.logger.info("Copying/updating installed system image directory %s", self.sys_image_dir)
+            utils.update_copy_tree(package_sys_image_dir, self.sys_image_dir)
         else:
-            self.logger.info(f"System image dir source not found at {package_sys_image_dir}")
+            self.logger.info("System image dir source not found at %s", package_sys_image_dir)
         possible_depot_path = self._in_project_dir("depot")
-        if os.path.isdir(possible_depot_path) and not self.questions.results['depot'] is False:
-            self.questions.results['depot'] = True
+        if os.path.isdir(possible_depot_path) and not results['depot'] is False:
+            results['depot'] = True
             self.logger.info("Found existing Python-project specific Julia depot")
-        if self.questions.results['depot'] is None and self._calljulia_name == "juliacall":
+        if results['depot'] is None and self._calljulia_name == "juliacall":
             # Only PyCall needs the possibility of a special depot
             # Not clear whether to ask in the case of juliacall or not
-            self.questions.results['depot'] = False
+            results['depot'] = False
 
-        if self.questions.results['depot'] is True:
+        if results['depot'] is True:
             self.depot_path = possible_depot_path
         else:
             self.depot_path = None
@@ -342,12 +388,14 @@ compatible with package that created this instance of JuliaProject.
 
         if self._calljulia_name == "pyjulia":
             needed_packages = ["PyCall"]
+            # Reuse the python found by _julia_env
+            os.environ.setdefault('PYCALL_JL_RUNTIME_PYTHON', _julia_env()["PYTHON"])
         elif self._calljulia_name == "juliacall":
             needed_packages = ["PythonCall"]
             # We do this above. So comment it out and test.
             # Only PyCall needs the possibility of a special depot
-            # if self.questions.results['depot'] is None:
-            #     self.questions.results['depot'] = False
+            # if results['depot'] is None:
+            #     results['depot'] = False
         else:
             needed_packages = None
 
@@ -356,21 +404,21 @@ compatible with package that created this instance of JuliaProject.
         _packages_to_add = basic.packages_to_add(self.project_path, needed_packages)
         if _need_resolve or _packages_to_add:
             self.questions.ask_questions()
-            if self.questions.results['depot'] is True: # May have changed depot
+            if results['depot'] is True: # May have changed depot
                 self.depot_path = possible_depot_path
             else:
                 self.depot_path = None
 
         def answer_rebuild_callback():
-            self.questions.results['depot'] = False # only one or the other
+            results['depot'] = False # only one or the other
             self.questions.ask_questions()
 
         def answer_depot_callback():
-            self.questions.results['depot'] = True
+            results['depot'] = True
             self.questions.ask_questions()
 
 
-        # print(f"Questions are {self.questions.results}")
+        # print(f"Questions are {results}")
         # ensure that packages, registries, etc. are installed
         if self._calljulia_name != "pyjulia":
             basic.ensure_project_ready(
@@ -399,12 +447,15 @@ compatible with package that created this instance of JuliaProject.
                 answer_depot_callback=answer_depot_callback
             )
 
-        if self.questions.results['depot'] is True:
+        if results['depot'] is True:
             assert possible_depot_path is not None
-            os.environ["JULIA_DEPOT_PATH"] = possible_depot_path
-            self.logger.info(f"Using private depot '{possible_depot_path}'")
+            self._pending_env["JULIA_DEPOT_PATH"] = possible_depot_path
+            self.logger.info("Using private depot '%s'", possible_depot_path)
         else:
             self.logger.info("Using default depot.")
+        # The environment is read by Julia when it starts, so apply the changes together here.
+        os.environ.update(self._pending_env)
+        self._pending_env.clear()
 
         self.calljulia = calljulia_lib(
             self.julia_path,
@@ -416,20 +467,24 @@ compatible with package that created this instance of JuliaProject.
         self.julia_system_image.set_calljulia(self.calljulia)
         # Start the Julia runtime via libjulia
         self.calljulia.start_julia()
+        # The system image cannot change while libjulia is running, so ask only once.
+        self._loaded_sys_image = self.calljulia.seval('unsafe_string(Base.JLOptions().image_file)')
+        # Either `julia` or `juliacall`: The Python/Julia interface module.
         self.julia = self.calljulia.julia # More convenient to get at this level
         self._load_julia_utils()
-        # Either `julia` or `juliacall`: The Python/Julia interface module.
-        self.julia = self.calljulia.julia
-        # Redundant
+        # Don't call into Julia for these unless they will be logged.
         # pylint: disable=no-member
-        self.logger.info(f'PyCall version: {self.julia.Main.pycall_version()}')
-        self.logger.info(f'PythonCall version: {self.julia.Main.pythoncall_version()}')
+        if self.logger.isEnabledFor(logging.INFO):
+            if self._calljulia_name == "pyjulia":
+                self.logger.info('PyCall version: %s', self.julia.Main.pycall_version())
+            else:
+                self.logger.info('PythonCall version: %s', self.julia.Main.pythoncall_version())
         if self._post_init_hook is not None:
             self._post_init_hook()
-        self._init_flags['initialized'] = True
+        self._initialized = True
         # Note that we consider initialization to have succeeded before we run the compilation
         # But, the post_init_hook is part of initialization
-        if self.questions.results['compile']:
+        if results['compile']:
             self.compile()
 
 
@@ -458,6 +513,7 @@ compatible with package that created this instance of JuliaProject.
 
     # For testing. Build PyCall with "wrong" libpython
     def _build_pycall_conda(self):
+        import julia_project_basic as basic # pylint: disable=import-outside-toplevel
         basic.rebuild_pycall(
             self.project_path,
             python_exe="conda",
@@ -466,10 +522,15 @@ compatible with package that created this instance of JuliaProject.
         )
 
 
+    # There is only one Julia runtime per process, so utils.jl is included at most once,
+    # even if there are several JuliaProject instances.
     def _load_julia_utils(self):
+        if JuliaProject._utils_loaded:
+            return
         srcdir = os.path.dirname(os.path.realpath(__file__))
         utilf = os.path.join(srcdir, "utils.jl")
-        self.calljulia.seval(f'include("{utilf}")')
+        self.calljulia.seval(f'Base.include(Main, {utils.julia_string_literal(utilf)})')
+        JuliaProject._utils_loaded = True
 
 
     def _setup_logging(self):
@@ -501,6 +562,8 @@ compatible with package that created this instance of JuliaProject.
 
 
     def _find_julia(self):
+        import find_julia # pylint: disable=import-outside-toplevel
+
         def other_questions(): # if one question asked, ask all questions at once
             self.questions.ask_question('compile')
             self.questions.ask_question('depot')
@@ -549,7 +612,7 @@ compatible with package that created this instance of JuliaProject.
             raise AttributeError(
                 "loaded_sys_image is not defined. The project has not been initialized."
             )
-        return self.calljulia.seval('unsafe_string(Base.JLOptions().image_file)')
+        return self._loaded_sys_image
 
 
     @property
@@ -564,8 +627,7 @@ compatible with package that created this instance of JuliaProject.
             raise AttributeError(
                 "JuliaSystemImage is not yet created, but system is initialized. Please file a bug report"
             )
-        loaded_dir = os.path.dirname(loaded)
-        return loaded_dir == self.julia_system_image.sys_image_dir
+        return os.path.dirname(loaded) == self.julia_system_image.sys_image_dir
 
 
     def compile(self):
@@ -578,9 +640,9 @@ compatible with package that created this instance of JuliaProject.
             warnings.warn("""
 You are requesting compiling a custom system image while running a custom-compiled system
 image, but this is not safe and not allowed. If you really want to compile a new system
-image, please restart your project, passing the keyword argument "use_system_image=False"
-to the method `project.ensure_init()`. Then call the method `project.compile()` again.
-Alternativley, you can call the method `project.clean()` and restart.
+image, call the method `project.clean()`, which removes the current system image, and restart
+your project. Then call the method `project.compile()` again. Without `clean()`, `compile()`
+does nothing if the system image was compiled from the same inputs.
 """)
         else:
             self.julia_system_image.compile()
@@ -592,8 +654,7 @@ Alternativley, you can call the method `project.clean()` and restart.
         and a compiled system image.
         """
         self.ensure_init()
-        for _file in [self._in_project_dir("Manifest.toml"), self._in_project_dir("JuliaManifest.toml"),
-                      self._in_package_dir(self.name + '.log')]:
+        for _file in self._project_manifests + [self._package_log]:
             utils.maybe_remove(_file)
         self.julia_system_image.clean()
 
@@ -604,8 +665,8 @@ Alternativley, you can call the method `project.clean()` and restart.
         directory will be created and initialized.
         """
         self.ensure_init()
-        project_dir = os.path.join(_get_parent_project_path(), self.name + "-" + self.julia_version)
-        if project_dir.find("julia_project") < 0:
+        project_dir = self.project_path
+        if "julia_project" not in project_dir:
             raise ValueError("Expecting project path to contain string 'julia_project'")
         if os.path.isdir(project_dir):
             self.logger.info(f"Removing project directory {project_dir}")
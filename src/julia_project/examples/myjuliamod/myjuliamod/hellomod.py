@@ -3,16 +3,20 @@ import sys
 # Import the instance of JuliaProject
 from ._julia_project import project
 
-# The user may have already called this line to initialize the Julia environment.
-# Calls to ensure_init after the first call are no-ops.
-# Because we include this line, the user may enter `import myjuliamod.hellomod`
-# without having first imported myjuliamod or having run ensure_init().
-# Omit this line if you want to force the user to call ensure_init explicitly.
-project.ensure_init()
+# We do not call project.ensure_init() here. Importing this module is cheap; Julia is
+# initialized the first time a Julia module is needed. Calls to ensure_init after the
+# first call are no-ops, so the user may also have called it already.
 
 
-# Import a Julia module. This works with either julia/PyCall or juliacall/PythonCall
-Example = project.simple_import("Example")
+# Import a Julia module lazily. This works with either julia/PyCall or juliacall/PythonCall.
+# The first access to `hellomod.Example` initializes the project and imports `Example`.
+def __getattr__(name):
+    if name == "Example":
+        project.ensure_init()
+        mod = project.simple_import("Example")
+        globals()["Example"] = mod
+        return mod
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Alternatively, For julia/PyCall
 # from julia import Example
@@ -23,7 +27,8 @@ Example = project.simple_import("Example")
 
 
 def hello():
-    return Example.hello("myjuliamod")
+    # Go through the module, so that `__getattr__` above initializes the project on first access.
+    return sys.modules[__name__].Example.hello("myjuliamod")
 
 # You may want to do something like the following.
 # This has the same effect as putting the following line in __init__.py:
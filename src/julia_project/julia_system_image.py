@@ -1,11 +1,85 @@
 import os
+import functools
+import hashlib
 import logging
 from . import utils
-import julia_project_basic as basic
-import julia as pyjulia_julia
 
 LOGGER = logging.getLogger('julia_project.system_image') # shorten this?
 
+# Files in the system image directory whose contents determine the compiled image.
+_STAMP_INPUTS = utils.PROJECT_TOMLS + utils.MANIFEST_TOMLS + ("packages.jl", "compile_exercise_script.jl")
+
+
+# The compile script is run in the system image directory, with its project active. It reads
+# the globals `pycall_loaded` and `pythoncall_loaded`, set in `JuliaSystemImage._compile`.
+# Resolving, instantiating and compiling are all done in this one script.
+_COMPILE_SCRIPT = '''
+import PackageCompiler
+using Libdl: Libdl
+let
+  # Assume that failure of resolve is because update() has not been called
+  # TODO: Find more precisely what error is raised.
+  try
+    Pkg.resolve()
+  catch err
+    err isa InterruptException && rethrow()
+    @info "Pkg.resolve() failed. Updating packages."
+    Pkg.update()
+    Pkg.resolve()
+  end
+  Pkg.instantiate()
+
+  ENV["PYCALL_JL_RUNTIME_PYTHON"] = Sys.which("python")
+  ENV["PYTHON"] = Sys.which("python")
+  packages = include("packages.jl")
+  if pycall_loaded
+     push!(packages, :PyCall)
+  end
+  if pythoncall_loaded
+     push!(packages, :PythonCall)
+  end
+  sysimage_path = joinpath(@__DIR__, "sys_julia_project." * Libdl.dlext)
+
+  kwargs = (sysimage_path=sysimage_path, incremental=true, project=joinpath(@__DIR__, "."))
+  if isfile("compile_exercise_script.jl")
+    kwargs = merge(kwargs, (precompile_execution_file=joinpath(@__DIR__, "compile_exercise_script.jl"),))
+  end
+  # Build on the image that is running, so that the code already in it is reused
+  # rather than compiled again. Older PackageCompiler does not take `base_sysimage`.
+  if hasmethod(PackageCompiler.create_sysimage, Tuple{Vector{Symbol}}, (:base_sysimage,))
+    kwargs = merge(kwargs, (base_sysimage=unsafe_string(Base.JLOptions().image_file),))
+  end
+  # PackageCompiler runs julia in subprocesses, which can use more than one thread
+  # for compiling the image. Settings made by the user take precedence.
+  withenv("JULIA_IMAGE_THREADS" => get(ENV, "JULIA_IMAGE_THREADS", string(min(Sys.CPU_THREADS, 8))),
+          "JULIA_NUM_THREADS" => get(ENV, "JULIA_NUM_THREADS", string(Sys.CPU_THREADS))) do
+    PackageCompiler.create_sysimage(packages; kwargs...)
+  end
+end
+'''
+
+
+def _parse_project(project_path):
+    """
+    Return the parsed (Julia)Project.toml in `project_path`. The result is cached
+    until the file changes.
+    """
+    # JuliaProject.toml takes precedence, as in Julia and julia_project_basic.
+    for name in ("JuliaProject.toml", "Project.toml"):
+        toml_path = os.path.join(project_path, name)
+        try:
+            _stat = os.stat(toml_path)
+        except FileNotFoundError:
+            continue
+        return _parse_toml_cached(toml_path, _stat.st_mtime_ns, _stat.st_size)
+    raise FileNotFoundError(utils.no_project_toml_message(project_path))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_toml_cached(toml_path, _mtime_ns, _size):
+    import julia_project_basic as basic # pylint: disable=import-outside-toplevel
+    return basic.parse_project(toml_path)
+
 
 class JuliaSystemImage:
     """
@@ -30,6 +104,11 @@ class JuliaSystemImage:
             self.sys_image_file_base + "-" + self.julia_version + utils.SHLIB_SUFFIX
         )
         self.compiled_system_image = self._in_sys_image_dir("sys_julia_project" + utils.SHLIB_SUFFIX)
+        self._stamp_path = self.sys_image_path + ".stamp"
+        self._manifest_tomls = (self._in_sys_image_dir("Manifest.toml"),
+                                self._in_sys_image_dir("JuliaManifest.toml"))
+        self._packages_file = self._in_sys_image_dir("packages.jl")
+        self._stamp_inputs = tuple((name, self._in_sys_image_dir(name)) for name in _STAMP_INPUTS)
         self.calljulia = None # Can't pass this. It must be set later.
         self.julia_path = julia_path
         self.project_path = project_path
@@ -50,23 +129,69 @@ class JuliaSystemImage:
         Delete some files created when installing Julia packages. These are Manifest.toml files
         and a compiled system image.
         """
-        for _file in [self._in_sys_image_dir("Manifest.toml"), self._in_sys_image_dir("JuliaManifest.toml"),
-                      self.sys_image_path]:
+        for _file in [*self._manifest_tomls, self.sys_image_path, self._stamp_path]:
             utils.maybe_remove(_file)
 
 
+    def _stamp(self):
+        """Return a hash of the inputs to compiling the system image."""
+        _hash = hashlib.blake2b(digest_size=16)
+        for name, path in self._stamp_inputs:
+            try:
+                with open(path, "rb") as fh:
+                    contents = fh.read()
+            except FileNotFoundError:
+                continue
+            _hash.update(f"{name}:{len(contents)};".encode('utf8'))
+            _hash.update(contents)
+        # The backend determines whether PyCall goes into the image. Both backends
+        # write the same image file.
+        _hash.update(f"{self.julia_version};{type(self.calljulia).__name__}".encode('utf8'))
+        return _hash.hexdigest()
+
+
+    def _read_stamp(self):
+        try:
+            with open(self._stamp_path, encoding='utf8') as fh:
+                return fh.readline().strip()
+        except OSError:
+            return None
+
+
+    def _write_stamp(self):
+        with open(self._stamp_path, "w", encoding='utf8') as fh:
+            fh.write(self._stamp() + "\n")
+
+
+    def _is_up_to_date(self):
+        """
+        Return `True` if the system image exists and was compiled from the current Project,
+        Manifest, packages.jl and compile_exercise_script.jl, with the current Julia version
+        and backend.
+        """
+        return os.path.isfile(self.sys_image_path) and self._read_stamp() == self._stamp()
+
+
     def compile(self):
         """
         Compile a system image for the dependent Julia packages in the subdirectory `./sys_image/`. This
         system image will be loaded the next time you import the Python module.
+
+        Nothing is done if the existing system image was compiled from the same inputs. Call
+        `clean` first to force recompilation.
         """
+        if self._is_up_to_date():
+            LOGGER.info("System image is up to date, not recompiling: %s", self.sys_image_path)
+            return
         Main = self.calljulia.julia.Main
         Pkg = self.calljulia.julia.Pkg
         current_path = Main.pwd()
         current_project = Pkg.project().path
         old_julia_project = os.getenv("JULIA_PROJECT")
+        import julia_project_basic as basic # pylint: disable=import-outside-toplevel
         try:
             self._compile()
+            self._write_stamp()
         except:
             print("Exception when compiling system image.")
             raise
@@ -76,73 +201,89 @@ class JuliaSystemImage:
             Pkg.activate(current_project)
 
 
-    def _ensure_pycall_pythoncall_imported(self):
-        Pkg = self.calljulia.julia.Pkg
-        project_path = self.project_path
-        deps = basic.parse_project(project_path)["deps"].keys()
+    def _add_and_import(self, to_add, to_import):
+        """
+        Add the packages `to_add` with a single `Pkg.add`, so that the resolver runs once.
+        Then import the packages `to_import` in a single call.
+        """
+        if to_add:
+            names = ", ".join(utils.julia_string_literal(name) for name in to_add)
+            self.calljulia.seval(f"Pkg.add([{names}])")
+        import juliacall  # Otherwise importing PythonCall below fails
+        self.calljulia.seval("import " + ", ".join(to_import))
+
+
+    def _pycall_ok(self):
         depot_path = self.calljulia.julia.Main.DEPOT_PATH[0]
-        pycall_ok = basic.test_pycall(
-            project_path, self.julia_path, depot_path=depot_path
+        import julia_project_basic as basic # pylint: disable=import-outside-toplevel
+        return basic.test_pycall(
+            self.project_path, self.julia_path, depot_path=depot_path
         )["pycall_ok"]
-        if not "PyCall" in deps and pyjulia_julia.find_libpython.linked_libpython() is not None and pycall_ok:
-            Pkg.add("PyCall")
-            self.calljulia.simple_import("PyCall")
+
+
+    def _ensure_pycall_pythoncall_imported(self):
+        deps = _parse_project(self.project_path)["deps"].keys()
+        to_add, to_import = [], []
+        # test_pycall runs julia in a subprocess, so only call it if PyCall might be added.
+        if not "PyCall" in deps and utils.linked_libpython() is not None and self._pycall_ok():
+            to_add.append("PyCall")
+            to_import.append("PyCall")
         if not "PythonCall" in deps:
-            Pkg.add("PythonCall")
-        import juliacall  # Otherwise import below fails
-        self.calljulia.simple_import("PythonCall")
+            to_add.append("PythonCall")
+        to_import.append("PythonCall")
+        self._add_and_import(to_add, to_import)
 
 
     def _compile(self):
         """
         Compile a Julia system image with all requirements for the julia project.
         """
-        Main = self.calljulia.julia.Main
-        Pkg = self.calljulia.julia.Pkg
-        if not os.path.isdir(self.sys_image_dir):
+        # Check for all required files with a single read of the directory.
+        try:
+            with os.scandir(self.sys_image_dir) as entries:
+                names = {entry.name for entry in entries}
+        except (FileNotFoundError, NotADirectoryError):
             msg = f"Can't find directory for compiling system image: {self.sys_image_dir}"
-            raise FileNotFoundError(msg)
+            raise FileNotFoundError(msg) from None
 
-        if not utils.has_project_toml(self.sys_image_dir):
+        if names.isdisjoint(utils.PROJECT_TOMLS):
             msg = utils.no_project_toml_message(self.sys_image_dir)
             LOGGER.error(msg)
             raise FileNotFoundError(msg)
 
+        if "packages.jl" not in names:
+            raise FileNotFoundError(f'{self._packages_file} does not exist')
+
         self._ensure_pycall_pythoncall_imported()
 
-        for _file in [self._in_sys_image_dir("Manifest.toml"), self._in_sys_image_dir("JuliaManifest.toml")]:
+        for _file in self._manifest_tomls:
             utils.maybe_remove(_file)
-        Main.eval('ENV["PYCALL_JL_RUNTIME_PYTHON"] = Sys.which("python")')
         assert isinstance(self.sys_image_dir, str)
-        Pkg.activate(self.sys_image_dir)
+        sys_image_dir_literal = utils.julia_string_literal(self.sys_image_dir)
+        # Each call from Python into Julia has a cost, so group these into one.
+        # _COMPILE_SCRIPT reads the globals `pycall_loaded` and `pythoncall_loaded`
+        # to decide which of the two packages go into the system image.
+        pycall_loaded, _ = self.calljulia.seval_all(f'''
+            ENV["PYCALL_JL_RUNTIME_PYTHON"] = Sys.which("python")
+            Pkg.activate({sys_image_dir_literal})
+            cd({sys_image_dir_literal})
+            pycall_loaded, pythoncall_loaded = is_loaded("PyCall"), is_loaded("PythonCall")
+            ''')
         os.environ["JULIA_PROJECT"] = self.sys_image_dir
-        pycall_loaded = Main.is_loaded("PyCall")
-        pythoncall_loaded = Main.is_loaded("PythonCall")
-        deps = basic.parse_project(self.sys_image_dir)["deps"].keys() # This is faster
+        deps = _parse_project(self.sys_image_dir)["deps"].keys() # This is faster
 #        deps = Main.parse_project()["deps"].keys()
         pycall_in_deps = "PyCall" in deps
         pythoncall_in_deps = "PythonCall" in deps
         # Let's try always including both of these. This might prevent crashes when
         # creating sys image with one of them, and loading it with the other
+        to_add, to_import = [], []
         if pycall_loaded and not pycall_in_deps:
-            Pkg.add("PyCall")
-            self.calljulia.simple_import("PyCall")
+            to_add.append("PyCall")
+            to_import.append("PyCall")
         if not pythoncall_in_deps:
-            Pkg.add("PythonCall")
-        import juliacall
-        self.calljulia.simple_import("PythonCall")
-        LOGGER.info("Compiling: probed Project.toml path: %s", Pkg.project().path)
-        Main.cd(self.sys_image_dir)
-        try:
-            Pkg.resolve()
-        # Assume that failure of resolve is because update() has not been called
-        # TODO: Find more precisely what error is raised.
-        except Exception:
-            msg = "Pkg.resolve() failed. Updating packages."
-            LOGGER.info(msg)
-            Pkg.update()
-            Pkg.resolve()
-        Pkg.instantiate()
+            to_add.append("PythonCall")
+        to_import.append("PythonCall")
+        self._add_and_import(to_add, to_import)
 
         # Following will also perform compilation, with more granual error messages
         # But, it is harder to read.
@@ -164,47 +305,11 @@ class JuliaSystemImage:
         # cj.seval_all("""PackageCompiler.create_sysimage(packages; sysimage_path=sysimage_path,
         # precompile_execution_file=joinpath(@__DIR__, "compile_exercise_script.jl"))""")
 
-        packages_file = os.path.join(self._in_sys_image_dir("packages.jl"))
-        if not os.path.exists(packages_file):
-            raise FileNotFoundError(f'{packages_file} does not exist')
-
-        _bool = {True: "true", False: "false"}
-
-        cscript = f'''
-        import PackageCompiler
-        using Libdl: Libdl
-        let
-          ENV["PYCALL_JL_RUNTIME_PYTHON"] = Sys.which("python")
-          ENV["PYTHON"] = Sys.which("python")
-          packages = include("packages.jl")
-          if {_bool[pycall_loaded]}
-             push!(packages, :PyCall)
-          end
-          if {_bool[pythoncall_loaded]}
-             push!(packages, :PythonCall)
-          end
-          sysimage_path = joinpath(@__DIR__, "sys_julia_project." * Libdl.dlext)
-
-          if isfile("compile_exercise_script.jl")
-            PackageCompiler.create_sysimage(packages; sysimage_path=sysimage_path,
-                precompile_execution_file=joinpath(@__DIR__, "compile_exercise_script.jl"),
-                incremental=true,
-                project=joinpath(@__DIR__, "."))
-          else
-            PackageCompiler.create_sysimage(packages; sysimage_path=sysimage_path,
-                incremental=true,
-                project=joinpath(@__DIR__, "."))
-          end
-        end
-        '''
         LOGGER.info("Running compile script.")
-        self.calljulia.seval_all(cscript)
-        if os.path.isfile(self.compiled_system_image):
-            LOGGER.info("Compiled image found: %s.", self.compiled_system_image)
-            os.rename(self.compiled_system_image, self.sys_image_path)
-            LOGGER.info("Renamed compiled image to: %s.", self.sys_image_path)
-            if not os.path.isfile(self.sys_image_path):
-                LOGGER.error("Failed renamed compiled image to: %s.", self.sys_image_path)
-                raise FileNotFoundError(self.compiled_system_image)
-        else:
-            raise FileNotFoundError(self.compiled_system_image)
+        self.calljulia.seval_all(_COMPILE_SCRIPT)
+        # os.replace overwrites an existing image, also on Windows, where os.rename fails.
+        try:
+            os.replace(self.compiled_system_image, self.sys_image_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(self.compiled_system_image) from None
+        LOGGER.info("Renamed compiled image %s to: %s.", self.compiled_system_image, self.sys_image_path)
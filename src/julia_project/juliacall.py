@@ -44,7 +44,7 @@ def load_libjulia(julia_path,
         os.chdir(os.path.dirname(libjulia_path))
         CONFIG['lib'] = libjulia = ctypes.PyDLL(libjulia_path, ctypes.RTLD_GLOBAL) # <-- avoids segfault
         if os.getenv("JULIA_PROJECT") != project:
-            print("JULIA_PROJECT NOT SET!")
+            LOGGER.warning("JULIA_PROJECT is %r, expected %r", os.getenv("JULIA_PROJECT"), project)
             os.environ['JULIA_PROJECT'] = project
         LOGGER.info(f"setting JULIA_PROJECT = {project}")
         if system_image is not None and os.path.exists(system_image):
@@ -1,5 +1,7 @@
 import os
+import functools
 import importlib
+import importlib.util
 import logging
 
 import julia
@@ -13,13 +15,22 @@ from . import lib
 LOGGER = logging.getLogger('julia_project.pyjulia')
 
 
+class PyCallNotBuiltError(Exception):
+    """Raised when PyCall.jl has not been built for the Julia found."""
+
+
 
 class PyJulia(CallJulia):
 
     julia = julia
 
+    # Julia can be initialized only once per process, while `JuliaProject.init` may create
+    # several instances, e.g. when retrying after a failure. So this is a class attribute.
+    _is_initialized = False
+
     def __init__(self,
                  julia_path,
+                 *,
                  project_path=None,
                  julia_system_image=None,
                  use_sys_image=None,
@@ -56,6 +67,12 @@ class PyJulia(CallJulia):
         self.api.jl_eval_string(bytes(cmd.encode('utf8')))
 
 
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _import_julia_submod(module : str):
+        return importlib.import_module("julia." + module)
+
+
     @classmethod
     def simple_import(cls, module : str):
         """
@@ -63,7 +80,7 @@ class PyJulia(CallJulia):
 
         `Example = self.simple_import("Example")`
         """
-        return importlib.import_module("julia." + module)
+        return cls._import_julia_submod(module)
 
 
     def _load_JuliaInfo(self):
@@ -81,7 +98,7 @@ class PyJulia(CallJulia):
         LOGGER.info("is_compatible_python = %r", is_compatible_python)
         # Both or the following should be prevented by install.py. Except if libpython statically linked.
         if not is_pycall_built:
-            raise Exception("PyCall is not built.")
+            raise PyCallNotBuiltError("PyCall is not built.")
         if not is_compatible_python:
             raise julia.core.UnsupportedPythonError(info)
 
@@ -93,8 +110,11 @@ class PyJulia(CallJulia):
 
 
     def start_julia(self):
+        if PyJulia._is_initialized:
+            LOGGER.info("Julia already initialized.")
+            return
         if os.getenv("JULIA_PROJECT") != self.project_path:
-            print("JULIA_PROJECT NOT SET!")
+            LOGGER.warning("JULIA_PROJECT is %r, expected %r", os.getenv("JULIA_PROJECT"), self.project_path)
         self.init_julia_module()
         sys_image_path = self.julia_system_image.sys_image_path
         if os.path.exists(sys_image_path):
@@ -102,15 +122,14 @@ class PyJulia(CallJulia):
                 self.api.sysimage = sys_image_path
                 LOGGER.info("Loading system image %s", sys_image_path)
                 # pylint: disable=unused-import,import-outside-toplevel
-                try:
-                    import juliacall
+                if importlib.util.find_spec("juliacall") is not None:
                     # Unfortunately, PythonCall does a lot of work just by existing in the system image.
                     # So this will slow startup time significantly if PythonCall is loaded.
-                    # But, because we have PYTHON_JULIACALL_NOINIT = yes, if PythonCall is *not* in
+                    # But, with PYTHON_JULIACALL_NOINIT = yes, if PythonCall is *not* in
                     # the system image, import juliacall is very fast.
+                    os.environ.setdefault("PYTHON_JULIACALL_NOINIT", "yes")
+                    import juliacall
                     LOGGER.info("Loading juliacall to avoid segfault in case PythonCall is in sysimage.")
-                except ModuleNotFoundError:
-                    pass
             else:
                 LOGGER.info("Custom system image found, but will not be used")
         else:
@@ -127,6 +146,7 @@ class PyJulia(CallJulia):
             import julia.Main
             import julia.Pkg
             LOGGER.info("PyCall, Base, and Main imported")
-        except JuliaError as err:
-            print("An error occured when initializing Julia.")
-            raise err
+            PyJulia._is_initialized = True
+        except JuliaError:
+            LOGGER.error("An error occured when initializing Julia.")
+            raise
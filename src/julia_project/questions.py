@@ -1,14 +1,15 @@
 from . import utils
 from . import environment
 
-_QUESTIONS = {'install' : "No Julia installation found. Would you like jill.py to download and install Julia?",
-              'compile' :
+# (key, prompt) pairs, in the order in which `ask_questions` asks them.
+_QUESTION_LIST = (('install', "No Julia installation found. Would you like jill.py to download and install Julia?"),
+                  ('compile',
 """
 I can compile a system image after installation.
 Compilation may take a few, or many, minutes. You may compile now, later, or never.
 Would you like to compile a system image after installation?
-""",
-              'depot' :
+"""),
+                  ('depot',
 """
 You can install all of the Julia packages and package information in a
 module-specific "depot", that is, one specific to this Python module. This may
@@ -17,8 +18,13 @@ installation locations.  If you answer "no", packages will be installed in the
 standard per-user Julia "depot".
 
 Would you like to use a python-module-specific depot for Julia packages?
-"""
-              }
+"""),
+                  )
+
+_QUESTIONS = dict(_QUESTION_LIST)
+
+# Values allowed for the environment variables that answer the questions.
+_YES_NO = {'y': True, 'n': False}
 
 
 class ProjectQuestions:
@@ -28,7 +34,8 @@ class ProjectQuestions:
                  env_vars=None,
                  logger=None,
                  ):
-        self.results = {"install": None, "compile": None, "depot": depot}
+        self.results = dict.fromkeys(_QUESTIONS)
+        self.results["depot"] = depot
         if env_vars is None:
             env_vars = environment.EnvVars()
         self.logger = logger
@@ -36,8 +43,12 @@ class ProjectQuestions:
 
 
     def ask_question(self, question_key):
+        return self._ask(question_key, _QUESTIONS[question_key])
+
+
+    def _ask(self, question_key, prompt):
         if self.results[question_key] is None:
-            result = utils.query_yes_no(_QUESTIONS[question_key])
+            result = utils.query_yes_no(prompt)
             if result is not None:
                 self.results[question_key] = result
                 self.logger.info(f"Question '{question_key}', answered {result}")
@@ -49,25 +60,21 @@ class ProjectQuestions:
 
     def ask_questions(self):
         result = None
-        for q in self.results:
-            result = self.ask_question(q)
+        for key, prompt in _QUESTION_LIST:
+            result = self._ask(key, prompt)
         return result
 
 
     def _read_one_variable(self, var_base_name, question_key):
-        var_name = self._env_vars.envname(var_base_name)
         result = self._env_vars.getenv(var_base_name)
-        if result:
-            if result == 'y':
-                self.results[question_key] = True
-                self.logger.info(f"read {var_name} = 'y'")
-            elif result == 'n':
-                self.results[question_key] = False
-                self.logger.info(f"read {var_name} = 'n'")
-            else:
-                raise ValueError(f"{var_name} must be y or n")
-        else:
-            self.logger.info(f"{var_name} not set")
+        if not result:
+            self.logger.info("%s not set", self._env_vars.envname(var_base_name))
+            return
+        try:
+            self.results[question_key] = _YES_NO[result]
+        except KeyError:
+            raise ValueError(f"{self._env_vars.envname(var_base_name)} must be y or n") from None
+        self.logger.info("read %s = %r", self._env_vars.envname(var_base_name), result)
 
 
     def read_environment_variables(self):
@@ -26,7 +26,7 @@ def test_min_init():
     assert jp.sys_image_dir == 'sys_image'
     assert jp._console_logging == False
     assert jp._logging_level == None
-    assert jp._init_flags['initialized'] == False
+    assert jp._initialized == False
     assert jp._question_results == {'install': None, 'compile': None, 'depot': None}
 
 
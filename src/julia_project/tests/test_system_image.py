@@ -0,0 +1,49 @@
+import os
+
+from julia_project.julia_system_image import JuliaSystemImage
+
+
+class PyJulia:
+    pass
+
+
+class JuliaCall:
+    pass
+
+
+def _sys_image(tmp_path, calljulia):
+    sys_image_dir = str(tmp_path)
+    with open(os.path.join(sys_image_dir, "Project.toml"), "w") as fh:
+        fh.write("[deps]\n")
+    sys_image = JuliaSystemImage("mymod", sys_image_dir, "julia", sys_image_dir, julia_version="1.8.0")
+    sys_image.set_calljulia(calljulia)
+    # Stand in for a compiled image
+    with open(sys_image.sys_image_path, "w"):
+        pass
+    sys_image._write_stamp()
+    return sys_image
+
+
+def test_stamp_up_to_date(tmp_path):
+    sys_image = _sys_image(tmp_path, JuliaCall())
+    assert sys_image._is_up_to_date()
+
+
+def test_stamp_changed_input(tmp_path):
+    sys_image = _sys_image(tmp_path, JuliaCall())
+    with open(os.path.join(str(tmp_path), "packages.jl"), "w") as fh:
+        fh.write("[:Example]\n")
+    assert not sys_image._is_up_to_date()
+
+
+def test_stamp_changed_backend(tmp_path):
+    sys_image = _sys_image(tmp_path, JuliaCall())
+    sys_image.set_calljulia(PyJulia())
+    assert not sys_image._is_up_to_date()
+
+
+def test_stamp_removed_by_clean(tmp_path):
+    sys_image = _sys_image(tmp_path, JuliaCall())
+    sys_image.clean()
+    assert not os.path.exists(sys_image._stamp_path)
+    assert not sys_image._is_up_to_date()
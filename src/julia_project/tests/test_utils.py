@@ -0,0 +1,115 @@
+import os
+import json
+import time
+
+from julia_project import utils
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fh.write(text)
+
+
+def _read(path):
+    with open(path) as fh:
+        return fh.read()
+
+
+def _make_src(tmp_path):
+    src = str(tmp_path / "src")
+    _write(os.path.join(src, "a"), "a")
+    _write(os.path.join(src, "sub", "b"), "b")
+    return src
+
+
+def test_update_copy_tree_copies(tmp_path):
+    src = _make_src(tmp_path)
+    dest = str(tmp_path / "dest")
+    assert utils.update_copy_tree(src, dest)
+    assert _read(os.path.join(dest, "a")) == "a"
+    assert _read(os.path.join(dest, "sub", "b")) == "b"
+
+
+def test_update_copy_tree_skips_when_synced(tmp_path):
+    src = _make_src(tmp_path)
+    dest = str(tmp_path / "dest")
+    utils.update_copy_tree(src, dest)
+    assert not utils.update_copy_tree(src, dest)
+
+
+def test_update_copy_tree_restores_deleted_file(tmp_path):
+    src = _make_src(tmp_path)
+    dest = str(tmp_path / "dest")
+    utils.update_copy_tree(src, dest)
+    os.remove(os.path.join(dest, "sub", "b"))
+    assert utils.update_copy_tree(src, dest)
+    assert _read(os.path.join(dest, "sub", "b")) == "b"
+
+
+def test_update_copy_tree_copies_newer_file(tmp_path):
+    src = _make_src(tmp_path)
+    dest = str(tmp_path / "dest")
+    utils.update_copy_tree(src, dest)
+    src_a = os.path.join(src, "a")
+    _write(src_a, "new a")
+    later = time.time() + 10
+    os.utime(src_a, (later, later))
+    assert utils.update_copy_tree(src, dest)
+    assert _read(os.path.join(dest, "a")) == "new a"
+
+
+def test_update_copy_tree_copies_file_with_older_mtime(tmp_path):
+    # As when an upgraded wheel is installed: the new file's mtime is earlier than the
+    # last sync, but later than the existing copy.
+    src = _make_src(tmp_path)
+    dest = str(tmp_path / "dest")
+    src_a = os.path.join(src, "a")
+    dest_a = os.path.join(dest, "a")
+    now = time.time()
+    os.utime(src_a, (now - 100, now - 100))
+    utils.update_copy_tree(src, dest)
+    _write(src_a, "new a")
+    os.utime(src_a, (now - 50, now - 50))
+    assert utils.update_copy_tree(src, dest)
+    assert _read(dest_a) == "new a"
+
+
+def test_julia_version_str_persistent(tmp_path, monkeypatch):
+    exe = str(tmp_path / "julia")
+    _write(exe, "")
+    cache_path = str(tmp_path / "cache" / "versions.json")
+    calls = []
+    def fake_version_str(path):
+        calls.append(path)
+        return "1.8.0"
+    monkeypatch.setattr(utils, "julia_version_str", fake_version_str)
+    assert utils.julia_version_str_persistent(exe, cache_path) == "1.8.0"
+    assert utils.julia_version_str_persistent(exe, cache_path) == "1.8.0"
+    assert len(calls) == 1
+    _write(exe, "changed")
+    assert utils.julia_version_str_persistent(exe, cache_path) == "1.8.0"
+    assert len(calls) == 2
+    assert os.listdir(os.path.dirname(cache_path)) == ["versions.json"]
+    with open(cache_path) as fh:
+        assert list(json.load(fh)) == [os.path.realpath(exe)]
+
+
+def test_julia_string_literal():
+    assert utils.julia_string_literal("/home/me/proj") == '"/home/me/proj"'
+    assert utils.julia_string_literal('C:\\Users\\me') == '"C:\\\\Users\\\\me"'
+    assert utils.julia_string_literal('a"b') == '"a\\"b"'
+    assert utils.julia_string_literal("$HOME/x") == '"\\$HOME/x"'
+    # Characters outside the BMP must not become surrogate pairs, which Julia would not combine.
+    assert utils.julia_string_literal("/home/\U0001F600") == '"/home/\U0001F600"'
+
+
+def test_julia_version_str_persistent_bad_entry(tmp_path, monkeypatch):
+    exe = str(tmp_path / "julia")
+    _write(exe, "")
+    exe_stat = os.stat(exe)
+    cache_path = str(tmp_path / "versions.json")
+    with open(cache_path, "w") as fh:
+        json.dump({os.path.realpath(exe): [exe_stat.st_mtime, exe_stat.st_size]}, fh)
+    monkeypatch.setattr(utils, "julia_version_str", lambda path: "1.8.0")
+    assert utils.julia_version_str_persistent(exe, cache_path) == "1.8.0"
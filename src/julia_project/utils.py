@@ -1,8 +1,12 @@
 import os
 import sys
 import shutil
-import sysconfig
+import functools
+import collections
 import subprocess
+import json
+import hashlib
+import tempfile
 
 import logging
 LOGGER = logging.getLogger('julia_project.utils') # shorten this?
@@ -10,16 +14,15 @@ LOGGER = logging.getLogger('julia_project.utils') # shorten this?
 is_windows = os.name == "nt"
 is_apple = sys.platform == "darwin"
 
-SHLIB_SUFFIX = sysconfig.get_config_var("SHLIB_SUFFIX")
-if SHLIB_SUFFIX is None:
-    if is_windows:
-        SHLIB_SUFFIX = ".dll"
-    else:
-        SHLIB_SUFFIX = ".so"
-if is_apple:
-    # sysconfig.get_config_var("SHLIB_SUFFIX") can be ".so" in macOS.
-    # Let's not use the value from sysconfig.
-    SHLIB_SUFFIX = ".dylib"
+# The suffix Julia uses for shared libraries (`Libdl.dlext`). The environment variable
+# JULIA_PROJECT_SHLIB_SUFFIX overrides it, for platforms not covered here.
+SHLIB_SUFFIX = (os.environ.get("JULIA_PROJECT_SHLIB_SUFFIX") or
+                (".dylib" if is_apple else ".dll" if is_windows else ".so"))
+
+
+_YES_NO_VALID = {"yes": True, "y": True, "ye": True,
+                 "no": False, "n": False}
+_YES_NO_PROMPTS = {None: " [y/n] ", "yes": " [Y/n] ", "no": " [y/N] "}
 
 
 # Copied from jill.py
@@ -33,68 +36,131 @@ def query_yes_no(question, default="yes"):
 
     The "answer" return value is True for "yes" or False for "no".
     """
-    valid = {"yes": True, "y": True, "ye": True,
-             "no": False, "n": False}
-    if default is None:
-        prompt = " [y/n] "
-    elif default == "yes":
-        prompt = " [Y/n] "
-    elif default == "no":
-        prompt = " [y/N] "
-    else:
-        raise ValueError(f"invalid default answer: '{default}'")
+    try:
+        prompt = question + _YES_NO_PROMPTS[default]
+    except KeyError:
+        raise ValueError(f"invalid default answer: '{default}'") from None
 
     while True:
-        sys.stdout.write(question + prompt)
+        sys.stdout.write(prompt)
         try:
             choice = input().lower()
         except KeyboardInterrupt as err:
             print(f"Got {err}")
             return None
         if default is not None and choice == '':
-            return valid[default]
-        if choice in valid:
-            return valid[choice]
+            return _YES_NO_VALID[default]
+        if choice in _YES_NO_VALID:
+            return _YES_NO_VALID[choice]
         sys.stdout.write("Please respond with 'yes' or 'no' "
                          "(or 'y' or 'n').\n")
 
 
+# This searches for and loads libpython, and the answer cannot change during a session.
+# `julia` is imported here, rather than at the top, because it is heavy and only needed
+# by pyjulia users.
+@functools.lru_cache(maxsize=1)
+def linked_libpython():
+    """Return the path to the libpython that python is linked to, or `None` if it is linked statically."""
+    import julia.find_libpython # pylint: disable=import-outside-toplevel
+    return julia.find_libpython.linked_libpython()
+
+
 # From PythonCall
 def julia_version_str(exe):
     """
     If exe is a julia executable, return its version as a string. Otherwise raise an exception.
+
+    Results are cached by the resolved path and mtime of `exe`.
     """
-    proc = subprocess.run([exe, "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    words = proc.stdout.decode('utf-8').split()
+    if not os.path.exists(exe): # Maybe a command name to be found in PATH
+        return _julia_version_str(exe)
+    real_exe = os.path.realpath(exe)
+    return _julia_version_str_cached(real_exe, os.stat(real_exe).st_mtime)
+
+
+@functools.lru_cache(maxsize=None)
+def _julia_version_str_cached(real_exe, _mtime):
+    return _julia_version_str(real_exe)
+
+
+def _julia_version_str(exe):
+    proc = subprocess.run([exe, "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          encoding='utf-8', timeout=5)
+    words = proc.stdout.split(maxsplit=3)
     if len(words) < 3 or words[0].lower() != 'julia' or words[1].lower() != 'version':
         raise ValueError(f"{exe} is not a julia executable")
     return words[2]
 
 
+def julia_version_str_persistent(exe, cache_path):
+    """
+    Like `julia_version_str`, but also cache the result in the JSON file `cache_path`,
+    keyed by the resolved path of `exe` and checked against its mtime and size. This
+    avoids starting julia on later runs.
+    """
+    if not os.path.exists(exe): # Maybe a command name to be found in PATH
+        return julia_version_str(exe)
+    real_exe = os.path.realpath(exe)
+    exe_stat = os.stat(real_exe)
+    stamp = [exe_stat.st_mtime, exe_stat.st_size]
+    try:
+        with open(cache_path, encoding='utf-8') as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        cache = {}
+    entry = cache.get(real_exe)
+    if isinstance(entry, list) and len(entry) == 3 and entry[:2] == stamp:
+        return entry[2]
+    version = julia_version_str(real_exe)
+    # Only the current entry for each executable is kept.
+    cache[real_exe] = stamp + [version]
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write a temporary file and move it into place, so that concurrent processes
+        # never see a partly written cache.
+        with tempfile.NamedTemporaryFile("w", encoding='utf-8', dir=cache_dir,
+                                         suffix=".tmp", delete=False) as fh:
+            json.dump(cache, fh)
+        os.replace(fh.name, cache_path)
+    except OSError as err:
+        LOGGER.info(f"Failed to write julia version cache {cache_path}: {err}")
+    return version
+
+
+# The environment is not expected to change during a session. Call
+# `default_depot_path.cache_clear()` if it does.
+# An empty first entry in JULIA_DEPOT_PATH, as in ":/shared/depot", stands for
+# the default user depot, as in Julia itself.
 # Adapted from PythonCall
+@functools.lru_cache(maxsize=1)
 def default_depot_path():
-    return (os.environ.get("JULIA_DEPOT_PATH", "").split(";" if os.name == "nt" else ":")[0]
+    return (os.environ.get("JULIA_DEPOT_PATH", "").split(os.pathsep)[0]
                or os.path.join(os.path.expanduser("~"), ".julia")
                )
 
 
 # Adapted from PythonCall
+@functools.lru_cache(maxsize=1)
 def get_virtual_env_path():
-    paths = [os.environ.get('VIRTUAL_ENV'), os.environ.get('CONDA_PREFIX'), os.environ.get('MAMBA_PREFIX')]
-    paths = [x for x in paths if x is not None]
-    if len(paths) == 0:
-        env_path = None
-    elif len(paths) == 1:
-        env_path = paths[0]
-    else:
-        raise Exception('You are using some mix of virtual, conda and mamba environments, cannot figure out which to use!')
+    env_path = None
+    for var in ('VIRTUAL_ENV', 'CONDA_PREFIX', 'MAMBA_PREFIX'):
+        path = os.environ.get(var)
+        if path is not None:
+            if env_path is not None:
+                raise Exception('You are using some mix of virtual, conda and mamba environments, cannot figure out which to use!')
+            env_path = path
     return env_path
 
 
 def maybe_remove(path):
-    if os.path.exists(path):
+    """Remove the file `path`, or a dangling symlink, if it exists."""
+    try:
         os.remove(path)
-        LOGGER.info(f"Removing {path}")
+    except FileNotFoundError:
+        return
+    LOGGER.info(f"Removing {path}")
 
 
 def update_copy(src, dest):
@@ -105,10 +171,73 @@ def update_copy(src, dest):
 
     Returns: None
     """
-    if os.path.exists(src):
-        if (not os.path.exists(dest) or
-            os.path.getmtime(dest) < os.path.getmtime(src)):
-            shutil.copy(src, dest)
+    try:
+        src_stat = os.stat(src)
+    except FileNotFoundError:
+        return
+    try:
+        dest_mtime = os.stat(dest).st_mtime
+    except FileNotFoundError:
+        dest_mtime = -1
+    if dest_mtime < src_stat.st_mtime:
+        copy_with_times(src, dest, src_stat)
+
+
+def copy_with_times(src, dest, src_stat):
+    """
+    Copy the contents of `src` to `dest` and give `dest` the times in `src_stat`,
+    the result of `os.stat(src)`. Setting the mtime prevents needless repeated copies.
+    """
+    # copyfile uses the platform's in-kernel copy (e.g. sendfile) where available.
+    shutil.copyfile(src, dest)
+    os.utime(dest, (src_stat.st_atime, src_stat.st_mtime))
+
+
+def julia_string_literal(_str):
+    """
+    Return `_str` as a Julia string literal, for interpolating paths into Julia code.
+    A JSON string is a valid Julia string literal, once `$` is escaped.
+    This also handles backslashes in Windows paths.
+    """
+    return json.dumps(_str, ensure_ascii=False).replace("$", "\\$")
+
+
+_LAST_SYNC = ".last_sync"
+
+
+def update_copy_tree(src, dest):
+    """
+    Copy the directory tree `src` into `dest`, copying each file as `update_copy` does.
+    If the files in `src` have not changed since the previous copy, and none is missing
+    from `dest`, do nothing.
+
+    Returns: `True` if the tree was copied, and `False` otherwise.
+    """
+    sentinel = os.path.join(dest, _LAST_SYNC)
+    src_files = []
+    for root, _, names in os.walk(src):
+        for name in names:
+            path = os.path.join(root, name)
+            _stat = os.stat(path)
+            src_files.append((os.path.relpath(path, src), _stat.st_mtime_ns, _stat.st_size))
+    # The state of `src` is recorded in the sentinel. Comparing times against the time of
+    # the last copy would miss a file replaced by one with an older mtime, as when a wheel is
+    # installed.
+    src_state = hashlib.sha256(repr(sorted(src_files)).encode('utf8')).hexdigest()
+    try:
+        with open(sentinel, encoding='utf8') as fh:
+            is_synced = fh.read().strip() == src_state
+    except OSError:
+        is_synced = False
+    if is_synced:
+        dest_files = {os.path.relpath(os.path.join(root, name), dest)
+                      for root, _, names in os.walk(dest) for name in names}
+        if all(rel_path in dest_files for rel_path, _, _ in src_files):
+            return False
+    shutil.copytree(src, dest, dirs_exist_ok=True, copy_function=update_copy)
+    with open(sentinel, "w", encoding='utf8') as fh:
+        fh.write(src_state + "\n")
+    return True
 
 
 def _project_toml(project_path):
@@ -123,15 +252,37 @@ def no_project_toml_message(project_path):
     return f'Neither "{_project_toml(project_path)}" nor "{_julia_project_toml(project_path)}" exist.'
 
 
+# The names Julia accepts for project and manifest files.
+PROJECT_TOMLS = ("Project.toml", "JuliaProject.toml")
+MANIFEST_TOMLS = ("Manifest.toml", "JuliaManifest.toml")
+
+
+ProjectDirInfo = collections.namedtuple("ProjectDirInfo", ["has_project", "has_manifest"])
+
+
+def scan_project_dir(project_path):
+    """
+    Return a `ProjectDirInfo` telling whether `project_path` contains a project file
+    and a manifest file. The directory is read once, rather than checking for each
+    file name separately. A missing directory contains neither.
+    """
+    has_project = has_manifest = False
+    try:
+        entries = os.scandir(project_path)
+    except OSError:
+        return ProjectDirInfo(has_project, has_manifest)
+    with entries:
+        for entry in entries:
+            if entry.name in PROJECT_TOMLS:
+                has_project = True
+            elif entry.name in MANIFEST_TOMLS:
+                has_manifest = True
+    return ProjectDirInfo(has_project, has_manifest)
+
+
 def has_project_toml(project_path):
-    return (
-            os.path.exists(_project_toml(project_path)) or
-            os.path.exists(_julia_project_toml(project_path))
-    )
+    return scan_project_dir(project_path).has_project
 
 
 def has_manifest_toml(_dir):
-    return (
-            os.path.exists(os.path.join(_dir, "Manifest.toml")) or
-            os.path.exists(os.path.join(_dir, "JuliaManifest.toml"))
-    )
+    return scan_project_dir(_dir).has_manifest